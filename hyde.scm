@@ -1,27 +1,46 @@
 (import scheme)
 (import (chicken base))
 (import (chicken format))
+(import (chicken io))
 (import (chicken irregex))
 (import (chicken port))
 (import (chicken sort))
 (import (chicken time posix))
 (import (srfi 1))
+(import (srfi 69))
 (import html-parser)
 (import hyde)
 (import (hyde atom))
 (import sxml-serializer)
 (import sxpath)
 
+(define rst
+  (make-external-translator
+   "rst2html"
+   (lambda ()
+     '("--link-stylesheet" "--smart-quotes=yes"
+       "--syntax-highlight=short" "--trim-footnote-reference-space"))))
+
+(define rst-body (sxpath "//body/div/node()"))
+
+(define (render-rst source)
+  (let* ((output (with-input-from-string source
+                   (lambda () (with-output-to-string rst))))
+         (dom (with-input-from-string output html->sxml)))
+    (serialize-sxml (rst-body dom) indent: #f)))
+
+;; the latest max-posts posts are inlined by the index and the feed
+;; as well, so keep the HTML around instead of running rst2html three
+;; times for them.  The cache is keyed by the whole source text and is
+;; never pruned, so a long hyde serve session keeps every edited
+;; revision in memory until it is restarted.
+(define rst-cache (make-hash-table string=? string-hash))
+
 (define (rst->html)
-  (let* ((rst
-          (make-external-translator
-           "rst2html"
-           (lambda ()
-             '("--link-stylesheet" "--smart-quotes=yes"
-               "--syntax-highlight=short" "--trim-footnote-reference-space"))))
-         (dom (with-input-from-string (with-output-to-string rst) html->sxml))
-         (html (serialize-sxml ((sxpath "//body/div/node()") dom) indent: #f)))
-      (display html)))
+  (let ((source (read-string #f)))
+    (unless (eof-object? source)
+      (display (hash-table-ref! rst-cache source
+                                (lambda () (render-rst source)))))))
 
 (translators (cons (list "rst" rst->html) (translators)))
 
@@ -33,16 +52,18 @@
 
 (define $ (environment-ref (page-eval-env) '$))
 
+(define post-irregex (irregex post-regex))
+
 (define (filter-posts)
-  (filter (lambda (page) (irregex-match post-regex (car page)))
-          (pages)))
+  (filter-map (lambda (page)
+                (and (irregex-match post-irregex (car page)) (cdr page)))
+              (pages)))
 
 (define (sort-by-date posts)
-  (sort posts (lambda (a b) (string>=? ($ 'date (cdr a))
-                                       ($ 'date (cdr b))))))
+  (sort posts (lambda (a b) (string>=? ($ 'date a) ($ 'date b)))))
 
 (define (all-posts)
-  (map cdr (sort-by-date (filter-posts))))
+  (sort-by-date (filter-posts)))
 
 (define max-posts 5)
 (define (latest-posts)
@@ -53,11 +74,14 @@
 
 ;; helpers
 
+(define (parse-date date)
+  (string->time date "%Y-%m-%d %H:%M:%S"))
+
 (define (pretty-date date)
-  (time->string (string->time date "%Y-%m-%d %H:%M:%S") "%d/%m/%Y"))
+  (time->string (parse-date date) "%d/%m/%Y"))
 
 (define (archive-date date)
-  (time->string (string->time date "%Y-%m-%d %H:%M:%S") "%Y-%m-%d"))
+  (time->string (parse-date date) "%Y-%m-%d"))
 
 (define (post-url post)
   (format "/posts/~a.html" (pathify ($ 'title post))))